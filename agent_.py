@@ -2,27 +2,19 @@ import os
 import json
 import re
 import asyncio
-from typing import TypedDict, List
+from typing import TypedDict, List, Optional
 
-from dotenv import load_dotenv
-from langgraph.graph import StateGraph
-from langchain_google_genai import ChatGoogleGenerativeAI
 from search_services import search_all
 from scrape_services import scrape_urls
 from llm_module import llm_call
+from content_store import content_store
+from deadline import Deadline
+from fanout import FanoutTracker
+from clients import get_llm
 
-import logging
+from logging_config import get_logger, summarize
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log messages will be saved to 'app.log'
-    filemode='a'  # Append to the log file instead of overwriting
-)
-logger = logging.getLogger(__name__)
-
-load_dotenv()
+logger = get_logger(__name__)
 
 def clean_with_regex(raw_string):
     """
@@ -42,24 +34,31 @@ def clean_with_regex(raw_string):
     return content_items
 
 
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.3,)
 
 class AgentState(TypedDict):
 
-    project_text: str
+    project_ref: str
     queries: List[str]
     search_results: List[dict]
     scrape_results: List[dict]
     stakeholder_details: List[dict]
+    deadline: Optional[Deadline]
+    fanout: FanoutTracker
+
 
+async def generate_queries_node(state: AgentState) -> AgentState:
 
-def generate_queries_node(state: AgentState) -> AgentState:
+    deadline = state.get("deadline")
+    if deadline is not None and deadline.expired:
+        deadline.mark_partial("query generation")
+        return {"queries": []}
 
-    project_text = state["project_text"]
+    project_text = content_store.get(state["project_ref"])
+    num_queries = state["fanout"].config.queries
 
     prompt = f"""
                 You are an expert research assistant.
-                Given the following project description, generate 1 *specific* search queries
+                Given the following project description, generate {num_queries} *specific* search queries
                 that could be used to find stakeholders (people, organizations, agencies, NGOs, companies)
                 interested in this project.
 
@@ -70,7 +69,19 @@ def generate_queries_node(state: AgentState) -> AgentState:
                 ["query 1", "query 2", ...]
                 """
 
-    response = llm.invoke(prompt)
+    # ainvoke runs on the client's async transport, so cancelling it at the
+    # deadline also aborts the HTTP request instead of leaving a thread behind.
+    call = get_llm().ainvoke(prompt)
+    try:
+        response = await (deadline.run(call) if deadline is not None else call)
+    except asyncio.TimeoutError:
+        # asyncio.TimeoutError is also what a timed-out HTTP call raises; only
+        # an expired deadline means the run was cut short.
+        if deadline is None or not deadline.expired:
+            logger.error("Query generation timed out before the request deadline")
+            raise
+        deadline.mark_partial("query generation")
+        return {"queries": []}
 
     content = response.content.strip()
 
@@ -82,28 +93,11 @@ def generate_queries_node(state: AgentState) -> AgentState:
         cleaned_list_2 = clean_with_regex(content)
         query_list = cleaned_list_2 if cleaned_list_2 else ["No valid queries generated"]
 
-    return {"queries": query_list}
-
+    return {"queries": query_list[:num_queries]}
 
 
-def search_node(state: AgentState) -> AgentState:
-    queries = state["queries"]
-    
-    all_results = []
-
-    for query in queries:
-        results = search_all(query, num_results=1)
-        all_results.append({
-            "query": query,
-            "results": results
-        })
-
-    return {"search_results": all_results}
-
-
-def scrape_node(state: AgentState) -> AgentState:
-    search_results = state["search_results"]
 
+def scrape_wave(search_results: list, deadline: Deadline, fanout: FanoutTracker) -> list:
     results = [
         {
             "query": item["query"],
@@ -115,45 +109,123 @@ def scrape_node(state: AgentState) -> AgentState:
         for result in item["results"]
         
     ]
-    scrape_result = scrape_urls(results)
+    scrape_result = scrape_urls(
+        results,
+        deadline=deadline,
+        fanout=fanout,
+        concurrency=fanout.config.scrape_concurrency,
+    )
 
     logger.info(f"Scraping completed with {len(scrape_result)} results.")
-    logger.info(f"Scraping completed: {scrape_result}")
+    logger.info("Scraping completed: %s", summarize(scrape_result))
 
-    return {"scrape_results": scrape_result}
+    return scrape_result
+
+
+async def search_and_scrape_node(state: AgentState) -> AgentState:
+    queries = state["queries"]
+    deadline = state.get("deadline")
+    fanout = state["fanout"]
+    config = fanout.config
+    
+    all_results = []
+    scrape_results = []
+
+    # Queries are searched concurrently in waves, and each wave's new URLs are
+    # scraped before the next wave starts, so the contact-domain limit seen
+    # while scraping can stop further searches. Between waves we also check
+    # the deadline and whether the last wave still added enough new URLs.
+    for start in range(0, len(queries), config.search_concurrency):
+        if deadline is not None and deadline.expired:
+            deadline.mark_partial("search")
+            break
+        if fanout.stop_reason("search"):
+            break
+
+        wave = queries[start:start + config.search_concurrency]
+        fanout.add_queries(wave)
+        wave_results = await asyncio.gather(*(
+            asyncio.to_thread(search_all, query, config.results_per_provider, deadline)
+            for query in wave
+        ))
+
+        returned = new = 0
+        wave_search_results = []
+        for query, results in zip(wave, wave_results):
+            unique = fanout.add_search_results(results)
+            returned += len(results)
+            new += len(unique)
+            wave_search_results.append({
+                "query": query,
+                "results": unique
+            })
+        fanout.check_saturation(returned, new)
+        all_results.extend(wave_search_results)
+
+        scrape_results.extend(await asyncio.to_thread(scrape_wave, wave_search_results, deadline, fanout))
+
+    return {"search_results": all_results, "scrape_results": scrape_results}
 
 
 async def stakeholder_details_node(state: AgentState) -> AgentState:
     scrape_data = state["scrape_results"]
-    stakeholder_details = await llm_call(scrape_data)
-    logger.info(f"Final Stakeholder Details: {stakeholder_details}")
+    fanout = state["fanout"]
+    stakeholder_details = await llm_call(
+        scrape_data,
+        deadline=state.get("deadline"),
+        fanout=fanout,
+        concurrency=fanout.config.llm_concurrency,
+    )
+    logger.info("Final Stakeholder Details: %s", summarize(stakeholder_details))
     all_stakeholders_details = [stakeholder for page in stakeholder_details for stakeholder in page.get("stakeholder_details", {}).get("stakeholders", [])]
-    logger.info(f"Last Final Stakeholder Details: {all_stakeholders_details}")
+    logger.info("Last Final Stakeholder Details: %s", summarize(all_stakeholders_details))
     return {"stakeholder_details": stakeholder_details}
 
-builder = StateGraph(AgentState)
+_graph = None
+
+
+def get_graph():
+    """
+    Build and compile the StateGraph on first use; langgraph is only imported here.
+    """
+    global _graph
+    if _graph is None:
+        from langgraph.graph import StateGraph
+
+        builder = StateGraph(AgentState)
 
-builder.add_node("generate_queries", generate_queries_node)
-builder.add_node("search", search_node)
-builder.add_node("scrape_urls", scrape_node)
-builder.add_node("generate_stakeholder_details", stakeholder_details_node)
+        builder.add_node("generate_queries", generate_queries_node)
+        builder.add_node("search_and_scrape", search_and_scrape_node)
+        builder.add_node("generate_stakeholder_details", stakeholder_details_node)
 
-builder.set_entry_point("generate_queries")
+        builder.set_entry_point("generate_queries")
 
-builder.add_edge("generate_queries", "search")
-builder.add_edge("search", "scrape_urls")
-builder.add_edge("scrape_urls", "generate_stakeholder_details")
+        builder.add_edge("generate_queries", "search_and_scrape")
+        builder.add_edge("search_and_scrape", "generate_stakeholder_details")
 
 
-builder.set_finish_point("generate_stakeholder_details")
+        builder.set_finish_point("generate_stakeholder_details")
 
-graph = builder.compile()
+        _graph = builder.compile()
+    return _graph
 
 
-async def run_agents(project_text: str):
+async def run_agents(project_ref: str, deadline: Deadline = None, fanout: FanoutTracker = None):
+    """
+    Run the full pipeline for the project text stored in `content_store` under
+    `project_ref`; the caller keeps ownership of that handle and releases it.
+    With a `deadline`, every stage stops issuing new work once it expires and
+    `deadline.partial` tells the caller that the returned stakeholders are
+    incomplete. `fanout` controls how wide the search goes (defaults to the
+    environment configuration).
+    """
     result = {}
     try:
-        result = await graph.ainvoke({"project_text": project_text})
+        result = await get_graph().ainvoke({
+            "project_ref": project_ref,
+            "deadline": deadline,
+            "fanout": fanout or FanoutTracker(),
+        })
 
     except Exception as e:
         print(f"Error: {str(e)}")
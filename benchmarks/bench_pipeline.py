@@ -0,0 +1,294 @@
+"""
+Offline end-to-end benchmark for the stakeholder pipeline.
+
+Runs `agent_.run_agents` (or `main.upload_file`) against the local stand-ins
+in benchmarks/stubs.py at several concurrency levels and reports throughput,
+p50/p95/p99 latency and peak RSS. No Google CSE, SerpAPI or Gemini quota is used.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_pipeline --target agents --concurrency 1,4,16
+    python -m benchmarks.bench_pipeline --target upload --llm-delay 0.2 --page-latency 0.05
+    python -m benchmarks.bench_pipeline --output bench.json
+    python -m benchmarks.bench_pipeline --baseline bench.json --tolerance 0.2
+
+With --baseline the run exits non-zero if p95 latency or throughput at any
+concurrency level regressed by more than --tolerance (a fraction).
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from benchmarks.stubs import FakeLLM, build_corpus, corpus_server, make_pdf, search_server, FILLER
+
+
+PROJECT_TEXT = (
+    "Community water and sanitation project looking for NGOs, local agencies, "
+    "funders and companies to partner on borehole drilling and hygiene education. "
+) * 20
+
+
+def percentile(values: list, pct: float) -> float:
+    """
+    Nearest-rank percentile; `pct` is in [0, 100].
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def current_rss_bytes() -> int:
+    """
+    Current resident set size, read from /proc where available.
+    Falls back to the process high-water mark elsewhere.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+class RssSampler:
+    """
+    Samples RSS in a background thread and keeps the peak seen while running.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, current_rss_bytes())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self.peak = current_rss_bytes()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, current_rss_bytes())
+
+
+def configure_environment(search_base_url: str):
+    """
+    Point the search services at the stub server and provide dummy keys so
+    the real clients can be constructed without credentials.
+    """
+    os.environ["GOOGLE_SEARCH_URL"] = f"{search_base_url}/customsearch/v1"
+    os.environ["SERP_API_URL"] = f"{search_base_url}/search"
+    os.environ.setdefault("GOOGLE_SEARCH_API_KEY", "bench")
+    os.environ.setdefault("GOOGLE_CX", "bench")
+    os.environ.setdefault("SERP_API_KEY", "bench")
+    os.environ.setdefault("GOOGLE_API_KEY", "bench")
+    # Keep benchmark runs out of the real stakeholder database.
+    os.environ.setdefault("STAKEHOLDER_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="bench-"), "stakeholders.db"))
+
+
+def install_fake_llm(fake_llm: FakeLLM):
+    from clients import set_llm
+
+    set_llm(fake_llm)
+
+
+def count_stakeholders(stakeholder_details) -> int:
+    """
+    Stakeholders found across the pages returned by the pipeline (0 for None).
+    """
+    return sum(
+        len(page.get("stakeholder_details", {}).get("stakeholders", []))
+        for page in stakeholder_details or []
+    )
+
+
+# Each job returns (partial, stakeholders): whether the pipeline reported a
+# partial (deadline-cut) result and how many stakeholders it found. The
+# pipeline swallows its own errors, so a run that found nothing counts as failed.
+
+async def _job_agents(job_id: int, pdf_bytes: bytes, deadline_s: float = None) -> tuple:
+    from agent_ import run_agents
+    from content_store import content_store
+    from deadline import Deadline
+
+    deadline = Deadline.from_request(deadline_s)
+    project_ref = content_store.put(f"{PROJECT_TEXT} Job {job_id}.")
+    try:
+        stakeholder_details = await run_agents(project_ref, deadline=deadline)
+    finally:
+        content_store.release(project_ref)
+    return deadline.partial, count_stakeholders(stakeholder_details)
+
+
+async def _job_upload(job_id: int, pdf_bytes: bytes, deadline_s: float = None) -> tuple:
+    from fastapi import UploadFile
+    from main import upload_file
+
+    upload = UploadFile(file=io.BytesIO(pdf_bytes), filename=f"bench-{job_id}-{uuid.uuid4().hex[:8]}.pdf")
+    response = await upload_file(upload, timeout=deadline_s)
+    return response["partial"], count_stakeholders(response.get("stakeholder_details"))
+
+
+JOBS = {
+    "agents": _job_agents,
+    "upload": _job_upload,
+}
+
+
+async def run_level(job, concurrency: int, requests: int, pdf_bytes: bytes, deadline_s: float = None) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+    partial = 0
+    found = 0
+
+    async def one(job_id: int):
+        nonlocal errors, partial, found
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                was_partial, stakeholders = await job(job_id, pdf_bytes, deadline_s)
+                partial += was_partial
+                found += stakeholders
+                if not stakeholders:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        wall = time.perf_counter() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": errors,
+        "partial": partial,
+        "stakeholders": found,
+        "wall_s": wall,
+        "throughput_rps": requests / wall if wall else 0.0,
+        "p50_s": percentile(latencies, 50),
+        "p95_s": percentile(latencies, 95),
+        "p99_s": percentile(latencies, 99),
+        "peak_rss_mb": sampler.peak / (1024 * 1024),
+    }
+
+
+def compare_to_baseline(results: list, baseline: list, tolerance: float) -> list:
+    """
+    Return a list of human-readable regressions against `baseline`.
+    """
+    regressions = []
+    by_level = {row["concurrency"]: row for row in baseline}
+
+    for row in results:
+        base = by_level.get(row["concurrency"])
+        if row["errors"]:
+            regressions.append(f"c={row['concurrency']}: {row['errors']} of {row['requests']} requests failed")
+        if not base:
+            continue
+        if base["p95_s"] and row["p95_s"] > base["p95_s"] * (1 + tolerance):
+            regressions.append(
+                f"c={row['concurrency']}: p95 {row['p95_s']:.3f}s vs baseline {base['p95_s']:.3f}s"
+            )
+        if base["throughput_rps"] and row["throughput_rps"] < base["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"c={row['concurrency']}: throughput {row['throughput_rps']:.2f}/s vs baseline {base['throughput_rps']:.2f}/s"
+            )
+
+    return regressions
+
+
+def print_table(target: str, results: list):
+    print(f"\nTarget: {target}")
+    print(f"{'conc':>5} {'reqs':>5} {'err':>4} {'part':>4} {'found':>6} {'rps':>8} {'p50 s':>8} {'p95 s':>8} {'p99 s':>8} {'peak MB':>8}")
+    for row in results:
+        print(
+            f"{row['concurrency']:>5} {row['requests']:>5} {row['errors']:>4} {row['partial']:>4} {row.get('stakeholders', 0):>6} "
+            f"{row['throughput_rps']:>8.2f} {row['p50_s']:>8.3f} {row['p95_s']:>8.3f} "
+            f"{row['p99_s']:>8.3f} {row['peak_rss_mb']:>8.1f}"
+        )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(JOBS), default="agents")
+    parser.add_argument("--concurrency", default="1,4,16", help="comma separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=0, help="requests per level (default: 2 x concurrency, at least 4)")
+    parser.add_argument("--pages", type=int, default=20, help="number of fixture pages in the corpus")
+    parser.add_argument("--pdf-every", type=int, default=4, help="serve every Nth page as a PDF (0 = HTML only)")
+    parser.add_argument("--paragraphs", type=int, default=6, help="filler paragraphs per page")
+    parser.add_argument("--page-latency", type=float, default=0.0, help="corpus server latency per request (s)")
+    parser.add_argument("--search-latency", type=float, default=0.0, help="search server latency per request (s)")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="fake LLM latency per call (s)")
+    parser.add_argument("--llm-queries", type=int, default=1, help="queries returned by the fake query generator")
+    parser.add_argument("--deadline", type=float, help="per-request time budget in seconds (default: server default)")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON file from a previous --output run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed regression as a fraction")
+    return parser.parse_args(argv)
+
+
+async def run_benchmark(args) -> list:
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+    corpus = build_corpus(pages=args.pages, pdf_every=args.pdf_every, paragraphs=args.paragraphs)
+    pdf_bytes = make_pdf([PROJECT_TEXT[:90], FILLER[:90], FILLER[90:180]])
+
+    with corpus_server(corpus, latency=args.page_latency) as pages:
+        with search_server(pages.base_url, sorted(corpus), latency=args.search_latency) as search:
+            configure_environment(search.base_url)
+            install_fake_llm(FakeLLM(delay=args.llm_delay, queries=args.llm_queries))
+
+            job = JOBS[args.target]
+            # Warm imports and connection setup outside of the measured levels.
+            await job(-1, pdf_bytes)
+
+            results = []
+            for level in levels:
+                requests = args.requests or max(4, level * 2)
+                results.append(await run_level(job, level, requests, pdf_bytes, args.deadline))
+
+    return results
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmark(args))
+    print_table(args.target, results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"target": args.target, "results": results}, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Cold-start benchmark: how long a fresh process takes to import `main` and to
+report ready on /readyz, with and without WARMUP=1.
+
+Each sample runs in a new interpreter so nothing is cached in-process. The
+search endpoints point at a local stub and the stakeholder database lives in
+a temporary directory, so warm-up never reaches the real APIs or data.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_startup --repeat 5
+    python -m benchmarks.bench_startup --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.bench_pipeline import configure_environment
+from benchmarks.stubs import search_server
+
+
+CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter() - started
+
+from fastapi.testclient import TestClient
+with TestClient(main.app) as client:
+    while True:
+        response = client.get("/readyz")
+        if response.status_code == 200 or response.json().get("status") == "error":
+            break
+        time.sleep(0.01)
+    ready = time.perf_counter() - started
+
+print(json.dumps({"import_s": imported, "ready_s": ready, "status": response.json().get("status")}))
+"""
+
+
+def sample(warmup: bool) -> dict:
+    env = dict(os.environ)
+    env["WARMUP"] = "1" if warmup else "0"
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-") as tmp, search_server("http://127.0.0.1", []) as search:
+        # Child processes inherit the stub endpoints, dummy keys and database path.
+        os.environ["STAKEHOLDER_DB_PATH"] = os.path.join(tmp, "stakeholders.db")
+        configure_environment(search.base_url)
+
+        print(f"{'mode':<10} {'import s':>9} {'ready s':>9} {'status':>8}")
+        for warmup in (False, True):
+            samples = [sample(warmup) for _ in range(args.repeat)]
+            row = {
+                "warmup": warmup,
+                "import_s": statistics.median(s["import_s"] for s in samples),
+                "ready_s": statistics.median(s["ready_s"] for s in samples),
+                "status": samples[-1]["status"],
+            }
+            results.append(row)
+            print(f"{'warmup' if warmup else 'default':<10} {row['import_s']:>9.3f} {row['ready_s']:>9.3f} {row['status']:>8}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, indent=2)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
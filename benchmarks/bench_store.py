@@ -0,0 +1,124 @@
+"""
+Benchmark for the persistent stakeholder store (stakeholder_store.py).
+
+Fills a temporary database with synthetic runs and reports p50/p95 latency
+of saving a run and of typical /stakeholders lookups. Every run also finds
+the same few generic contacts (info@ addresses), so save cost that grows with
+how often a stakeholder recurs shows up as a gap between early and late saves.
+
+Usage (from the repository root):
+
+    python -m benchmarks.bench_store --stakeholders 20000
+    python -m benchmarks.bench_store --stakeholders 3000 --recurring 3
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_pipeline import percentile
+
+
+TOPICS = ["water sanitation", "stem education", "renewable energy", "public health", "open data"]
+
+
+def synthetic_run(run: int, per_page: int, pages: int, recurring: int = 0) -> tuple:
+    """
+    One run's (metadata, stakeholder_details). As in real runs, the project
+    topic appears only in the document's queries and preview, not in the
+    stakeholders or page titles. Every page also lists `recurring` generic
+    contacts that every run finds again.
+    """
+    rng = random.Random(run)
+    topic = TOPICS[run % len(TOPICS)]
+    metadata = {
+        "filename": f"run-{run}.pdf",
+        "uploadtime": "",
+        "wordcount": 0,
+        "queries": [f"{topic} partner organisations", f"{topic} funders"],
+        "preview": f"Project proposal {run}: a {topic} programme looking for partners.",
+    }
+    details = []
+    for p in range(pages):
+        org_id = rng.randrange(2000)
+        stakeholders = []
+        for i in range(per_page):
+            person = rng.randrange(10 ** 6)
+            stakeholders.append({
+                "name": f"Person {person}",
+                "organization": f"Org {org_id} Trust",
+                "email": f"person{person}@org{org_id}.example.org" if i % 3 else "",
+                "phone": f"+1 555 {person:06d}" if i % 4 == 0 else "",
+                "social_links": {"linkedin": f"https://linkedin.com/in/p{person}"} if i % 5 == 0 else {},
+                "other_info": "Programme contact",
+            })
+        stakeholders.extend(
+            {"name": "", "organization": f"Network {k}", "email": f"info@network{k}.example.org"}
+            for k in range(recurring)
+        )
+        details.append({
+            "title": f"Org {org_id} team",
+            "link": f"https://org{org_id}.example.org/team/{run}-{p}",
+            "snippet": f"Meet the people at Org {org_id}",
+            "stakeholder_details": {"stakeholders": stakeholders},
+        })
+    return metadata, details
+
+
+def queries(sample: dict) -> dict:
+    stakeholder = sample["stakeholder_details"]["stakeholders"][1]
+    return {
+        "keyword": dict(q="water sanitation"),
+        "keyword+email": dict(q="water sanitation", contact_type="email"),
+        "organization": dict(organization=stakeholder["organization"]),
+        "domain": dict(domain=stakeholder["email"].split("@")[1]),
+        "contact_type page 5": dict(contact_type="phone", page=5),
+        "unfiltered": dict(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stakeholders", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--recurring", type=int, default=3, help="generic contacts found again by every run")
+    args = parser.parse_args(argv)
+
+    from stakeholder_store import StakeholderStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StakeholderStore(os.path.join(tmp, "bench.db"))
+
+        per_page, pages = 10, 5
+        runs = max(1, args.stakeholders // (per_page * pages))
+        saves = []
+        for run in range(runs):
+            t0 = time.perf_counter()
+            store.save_run(*synthetic_run(run, per_page, pages, args.recurring))
+            saves.append((time.perf_counter() - t0) * 1000)
+        total = store.search(page_size=1)["total"]
+        print(f"Stored {total} unique stakeholders from {runs} runs in {sum(saves) / 1000:.1f}s")
+
+        tenth = max(1, runs // 10)
+        print(f"{'save':<22} {'runs':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, timings in (("first 10% of runs", saves[:tenth]), ("last 10% of runs", saves[-tenth:])):
+            print(f"{label:<22} {len(timings):>7} {percentile(timings, 50):>8.2f} {percentile(timings, 95):>8.2f}")
+
+        print(f"{'query':<22} {'hits':>7} {'p50 ms':>8} {'p95 ms':>8}")
+        for label, kwargs in queries(synthetic_run(0, per_page, pages)[1][0]).items():
+            timings = []
+            for _ in range(args.repeat):
+                t0 = time.perf_counter()
+                result = store.search(**kwargs)
+                timings.append((time.perf_counter() - t0) * 1000)
+            print(f"{label:<22} {result['total']:>7} {percentile(timings, 50):>8.2f} {percentile(timings, 95):>8.2f}")
+
+        store.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
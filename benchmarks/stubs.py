@@ -0,0 +1,282 @@
+"""
+Local stand-ins for the external services the pipeline talks to:
+
+- a fake search server answering both the Google CSE (`items`) and the
+  SerpAPI (`organic_results`) response shapes,
+- a corpus server serving a generated set of HTML and PDF pages,
+- a deterministic fake LLM exposing the same `invoke(prompt).content`
+  interface as `ChatGoogleGenerativeAI`.
+
+Latencies are configurable so the scrape and LLM stages can be loaded
+without spending any real search or Gemini quota.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+EMAIL_PATTERN = r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}"
+
+FILLER = (
+    "The programme supports community water and sanitation projects, school "
+    "STEM clubs and open data initiatives across the region. Partners provide "
+    "funding, technical assistance and volunteer time to local organisations. "
+)
+
+
+def _stable_int(text: str) -> int:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines: list) -> bytes:
+    """
+    Build a minimal single-page PDF (Helvetica text only) that pdfplumber can read.
+    """
+    stream_lines = ["BT", "/F1 10 Tf", "12 TL", "40 800 Td"]
+    for line in lines:
+        stream_lines.append(f"({_pdf_escape(line)}) Tj T*")
+    stream_lines.append("ET")
+    stream = "\n".join(stream_lines).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+        b"/Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n".encode()
+    out += b"0000000000 65535 f \n"
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+
+    return bytes(out)
+
+
+def _page_lines(idx: int, paragraphs: int) -> list:
+    org = f"Example Org {idx}"
+    lines = [
+        f"{org} - Community Partnerships",
+        f"Contact: Person {idx}, Programme Lead at {org}",
+        f"Email: person{idx}@org{idx}.example.org",
+        f"Phone: +1 555 010 {idx:04d}",
+    ]
+    for p in range(paragraphs):
+        lines.append(f"{p + 1}. {FILLER}")
+    return lines
+
+
+def build_corpus(pages: int = 20, pdf_every: int = 4, paragraphs: int = 6) -> dict:
+    """
+    Generate the fixture corpus: {path: (content_type, body)}.
+    Every `pdf_every`-th page is served as a PDF, the rest as HTML.
+    """
+    corpus = {}
+    for idx in range(pages):
+        lines = _page_lines(idx, paragraphs)
+
+        if pdf_every and idx % pdf_every == pdf_every - 1:
+            # PDFs get one short line per filler sentence to stay on the page.
+            pdf_lines = lines[:4] + [s.strip() + "." for s in FILLER.split(".") if s.strip()] * paragraphs
+            corpus[f"/docs/page-{idx}.pdf"] = ("application/pdf", make_pdf(pdf_lines[:60]))
+        else:
+            body = "\n".join(f"<p>{line}</p>" for line in lines)
+            html = (
+                f"<html><head><title>Page {idx}</title><style>p {{margin: 0}}</style></head><body>"
+                f"{body}"
+                f"<a href=\"mailto:info@org{idx}.example.org\">Email us</a>"
+                f"<a href=\"https://www.linkedin.com/company/example-org-{idx}/\">LinkedIn</a>"
+                f"<a href=\"https://twitter.com/exampleorg{idx}\">Twitter</a>"
+                f"<script>var tracking = {idx};</script>"
+                f"</body></html>"
+            )
+            corpus[f"/pages/page-{idx}.html"] = ("text/html; charset=utf-8", html.encode("utf-8"))
+
+    return corpus
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up early (e.g. on a deadline) are expected here.
+        pass
+
+
+class _StubServer:
+    """
+    Runs a ThreadingHTTPServer on 127.0.0.1 in a daemon thread.
+    """
+
+    def __init__(self, handler_cls):
+        self.httpd = _QuietHTTPServer(("127.0.0.1", 0), handler_cls)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _QuietHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def corpus_server(corpus: dict, latency: float = 0.0) -> _StubServer:
+    """
+    Serve `corpus` (see build_corpus) with a fixed per-request latency in seconds.
+    """
+
+    class Handler(_QuietHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            path = urlparse(self.path).path
+            if path not in corpus:
+                self._send(404, "text/plain", b"not found")
+                return
+            content_type, body = corpus[path]
+            self._send(200, content_type, body)
+
+    return _StubServer(Handler)
+
+
+def search_server(corpus_base_url: str, paths: list, latency: float = 0.0) -> _StubServer:
+    """
+    Fake search API. `/customsearch/v1` answers in the Google CSE shape and
+    `/search` in the SerpAPI shape. Results are picked deterministically from
+    `paths` based on the query, honouring `num` and CSE-style `start`.
+    """
+
+    class Handler(_QuietHandler):
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            parsed = urlparse(self.path)
+            params = parse_qs(parsed.query)
+            query = params.get("q", [""])[0]
+            num = int(params.get("num", ["10"])[0] or 10)
+            start = int(params.get("start", ["1"])[0] or 1)
+
+            offset = _stable_int(query) + start - 1
+            if parsed.path.endswith("/search"):
+                offset += len(paths) // 2
+
+            items = []
+            for i in range(num):
+                path = paths[(offset + i) % len(paths)]
+                items.append({
+                    "title": f"Result {path}",
+                    "link": f"{corpus_base_url}{path}",
+                    "snippet": f"Stakeholders related to {query}",
+                })
+
+            key = "organic_results" if parsed.path.endswith("/search") else "items"
+            self._send(200, "application/json", json.dumps({key: items}).encode("utf-8"))
+
+    return _StubServer(Handler)
+
+
+@dataclass
+class FakeMessage:
+    content: str
+
+
+class FakeLLM:
+    """
+    Deterministic stand-in for ChatGoogleGenerativeAI.
+
+    Query-generation prompts get a JSON list of `queries` strings; stakeholder
+    prompts get a fenced ```json block with one stakeholder per email found in
+    the prompt text. `delay` (seconds) is slept on every call.
+    """
+
+    def __init__(self, delay: float = 0.0, queries: int = 1, max_stakeholders: int = 5):
+        self.delay = delay
+        self.queries = queries
+        self.max_stakeholders = max_stakeholders
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _respond(self, prompt: str) -> str:
+        if "search queries" in prompt:
+            seed = _stable_int(prompt)
+            return json.dumps([f"stakeholder query {seed % 1000} variant {i}" for i in range(self.queries)])
+
+        emails = []
+        for email in re.findall(EMAIL_PATTERN, prompt):
+            if email not in emails and not email.endswith("acmecorp.com"):
+                emails.append(email)
+
+        stakeholders = [
+            {
+                "name": email.split("@")[0],
+                "organization": email.split("@")[1],
+                "email": email,
+                "phone": "",
+                "social_links": {},
+                "other_info": "",
+            }
+            for email in emails[: self.max_stakeholders]
+        ]
+        return "```json\n" + json.dumps({"stakeholders": stakeholders}, indent=2) + "\n```"
+
+    def invoke(self, prompt: str) -> FakeMessage:
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return FakeMessage(content=self._respond(prompt))
+
+    async def ainvoke(self, prompt: str) -> FakeMessage:
+        # Sleeps on the event loop so that, like the real client, a cancelled
+        # call stops immediately.
+        with self._lock:
+            self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        return FakeMessage(content=self._respond(prompt))
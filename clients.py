@@ -0,0 +1,70 @@
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Shared, lazily created clients. Importing this module is cheap: the Gemini
+# client (and the langchain / google-genai stack behind it) and the HTTP
+# connection pool are only built on first use, or up front by the app's
+# lifespan hook so the first request does not pay for them.
+#
+# Environment variables:
+#   LLM_MODEL          Gemini model name (default: gemini-2.5-flash)
+#   HTTP_POOL_SIZE     connections kept per host (default: 16)
+
+_lock = threading.Lock()
+_llm = None
+_http_session = None
+
+
+def get_llm():
+    """
+    The single ChatGoogleGenerativeAI client used for query generation and extraction.
+    """
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                from langchain_google_genai import ChatGoogleGenerativeAI
+                _llm = ChatGoogleGenerativeAI(model=os.getenv("LLM_MODEL", "gemini-2.5-flash"), temperature=0.3,)
+    return _llm
+
+
+def set_llm(llm):
+    """
+    Replace the shared LLM client, e.g. with a local stand-in for benchmarks.
+    """
+    global _llm
+    with _lock:
+        _llm = llm
+
+
+def get_http_session() -> requests.Session:
+    """
+    A pooled requests.Session shared by the search and scrape services.
+    """
+    global _http_session
+    if _http_session is None:
+        with _lock:
+            if _http_session is None:
+                pool_size = int(os.getenv("HTTP_POOL_SIZE", 16))
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _http_session = session
+    return _http_session
+
+
+def close_clients():
+    global _http_session
+    with _lock:
+        if _http_session is not None:
+            _http_session.close()
+            _http_session = None
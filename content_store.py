@@ -0,0 +1,164 @@
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Page and document text is kept out of the LangGraph state. Callers `put` the
+# text and pass the returned handle (its sha256) around instead; `get` loads the
+# text back when it is needed and `release` drops it once the caller is done.
+#
+# Entries are reference counted, so the same page scraped by two concurrent
+# jobs is stored once. Recently used text stays in memory up to
+# CONTENT_STORE_MEMORY_BYTES; older entries are spilled to disk.
+#
+# Each process spills into its own `<pid>-*` directory under CONTENT_STORE_DIR,
+# so worker processes never delete each other's files. The directory is removed
+# at exit, and directories left behind by processes that are no longer running
+# are swept when a new one is created.
+
+
+def _remove_spill_dir(path: str, pid: int):
+    # atexit handlers are inherited across fork; only the owner removes its directory.
+    if os.getpid() == pid:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class ContentStore:
+
+    def __init__(self, max_memory_bytes: int, spill_root: str):
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_root = spill_root
+        self.spill_dir = None          # per-process directory, created on first spill
+        self._spill_pid = None
+        self._memory = OrderedDict()   # handle -> bytes, in LRU order
+        self._memory_bytes = 0
+        self._refs = {}                # handle -> reference count
+        self._on_disk = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_memory_bytes=int(os.getenv("CONTENT_STORE_MEMORY_BYTES", 64 * 1024 * 1024)),
+            spill_root=os.getenv("CONTENT_STORE_DIR", os.path.join(tempfile.gettempdir(), "stakeholder-content")),
+        )
+
+    def _path(self, handle: str) -> str:
+        return os.path.join(self.spill_dir, handle)
+
+    def _ensure_spill_dir(self):
+        # Called with the lock held. A forked worker gets a fresh directory.
+        if self._spill_pid == os.getpid():
+            return
+        os.makedirs(self.spill_root, exist_ok=True)
+        self._sweep_stale()
+        self.spill_dir = tempfile.mkdtemp(prefix=f"{os.getpid()}-", dir=self.spill_root)
+        self._spill_pid = os.getpid()
+        self._on_disk.clear()
+        atexit.register(_remove_spill_dir, self.spill_dir, self._spill_pid)
+
+    def _sweep_stale(self):
+        # Remove directories whose owning process has exited (POSIX only:
+        # os.kill(pid, 0) is not a liveness probe on Windows).
+        if os.name != "posix":
+            return
+        for name in os.listdir(self.spill_root):
+            pid, _, _ = name.partition("-")
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                shutil.rmtree(os.path.join(self.spill_root, name), ignore_errors=True)
+                logger.info(f"Removed stale content spill directory {name}")
+            except OSError:
+                pass
+
+    def put(self, text: str) -> str:
+        """
+        Store `text` and return its handle. Each put must be matched by a release.
+        """
+        data = (text or "").encode("utf-8")
+        handle = hashlib.sha256(data).hexdigest()
+
+        with self._lock:
+            self._refs[handle] = self._refs.get(handle, 0) + 1
+            if handle in self._memory:
+                self._memory.move_to_end(handle)
+            elif handle not in self._on_disk:
+                self._memory[handle] = data
+                self._memory_bytes += len(data)
+                self._spill()
+
+        return handle
+
+    def get(self, handle: str) -> str:
+        """
+        Return the text for `handle`, loading it back from disk if it was spilled.
+        """
+        with self._lock:
+            data = self._memory.get(handle)
+            if data is not None:
+                self._memory.move_to_end(handle)
+                return data.decode("utf-8")
+            if handle not in self._on_disk:
+                raise KeyError(f"Unknown content handle: {handle}")
+
+            with open(self._path(handle), "rb") as f:
+                data = f.read()
+            self._memory[handle] = data
+            self._memory_bytes += len(data)
+            self._spill(keep=handle)
+
+        return data.decode("utf-8")
+
+    def release(self, handle: str):
+        """
+        Drop one reference to `handle`; the text is deleted once nobody holds it.
+        """
+        with self._lock:
+            count = self._refs.get(handle, 0) - 1
+            if count > 0:
+                self._refs[handle] = count
+                return
+
+            self._refs.pop(handle, None)
+            data = self._memory.pop(handle, None)
+            if data is not None:
+                self._memory_bytes -= len(data)
+            if handle in self._on_disk:
+                self._on_disk.discard(handle)
+                try:
+                    os.remove(self._path(handle))
+                except OSError as e:
+                    logger.warning(f"Could not remove spilled content {handle}: {str(e)}")
+
+    def _spill(self, keep: str = None):
+        # Called with the lock held: move least recently used entries to disk
+        # until the in-memory total fits the budget.
+        while self._memory_bytes > self.max_memory_bytes and len(self._memory) > 1:
+            handle, data = next(iter(self._memory.items()))
+            if handle == keep:
+                self._memory.move_to_end(handle)
+                continue
+
+            del self._memory[handle]
+            self._memory_bytes -= len(data)
+            if handle not in self._on_disk:
+                self._ensure_spill_dir()
+                tmp_path = self._path(handle) + ".tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                os.replace(tmp_path, self._path(handle))
+                self._on_disk.add(handle)
+
+
+content_store = ContentStore.from_env()
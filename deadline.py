@@ -0,0 +1,102 @@
+import asyncio
+import os
+import threading
+import time
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Every /upload run gets one Deadline. It is carried in the graph state and
+# passed to search, scrape and LLM calls, which size their own timeouts from
+# the remaining budget and stop issuing new work once it is exhausted or the
+# client has disconnected. Stages that cut work short mark the run partial.
+#
+# Environment variables:
+#   REQUEST_DEADLINE_SECONDS      default budget per request (default: 180)
+#   REQUEST_DEADLINE_MAX_SECONDS  upper bound for a per-call budget (default: 600)
+
+DEFAULT_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 180))
+MAX_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_MAX_SECONDS", 600))
+
+
+class Deadline:
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        self.partial = False
+        self.reason = None
+        self._cancelled = threading.Event()
+
+    @classmethod
+    def from_request(cls, seconds: float = None):
+        """
+        Build the deadline for a request, falling back to the server default
+        and clamping per-call values to REQUEST_DEADLINE_MAX_SECONDS.
+        """
+        if seconds is None or seconds <= 0:
+            seconds = DEFAULT_DEADLINE_SECONDS
+        return cls(min(seconds, MAX_DEADLINE_SECONDS))
+
+    def remaining(self) -> float:
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: float) -> float:
+        """
+        Timeout for a single call: `cap`, or less if the budget is running out.
+        """
+        return max(0.1, min(cap, self.remaining()))
+
+    def cancel(self, reason: str = "cancelled"):
+        if not self._cancelled.is_set():
+            logger.info(f"Deadline cancelled: {reason}")
+            self.reason = reason
+            self._cancelled.set()
+
+    def mark_partial(self, stage: str):
+        """
+        Record that `stage` skipped or abandoned work because the budget ran out.
+        """
+        if not self.partial:
+            self.reason = self.reason or "deadline exceeded"
+            logger.warning(f"Deadline reached during {stage} ({self.reason}); returning partial results")
+        self.partial = True
+
+    async def wait(self, poll: float = 0.25):
+        """
+        Return once the deadline expires or is cancelled.
+        """
+        while not self.expired:
+            await asyncio.sleep(min(poll, self.remaining()))
+
+    async def run(self, awaitable):
+        """
+        Await `awaitable`, cancelling it and raising asyncio.TimeoutError if the
+        deadline expires or is cancelled first.
+        """
+        task = asyncio.ensure_future(awaitable)
+        watcher = asyncio.create_task(self.wait())
+        try:
+            await asyncio.wait([task, watcher], return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            task.cancel()
+            raise
+        finally:
+            watcher.cancel()
+
+        if not task.done():
+            task.cancel()
+            raise asyncio.TimeoutError
+        return task.result()
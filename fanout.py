@@ -0,0 +1,153 @@
+import os
+import threading
+from dataclasses import dataclass
+
+from logging_config import get_logger
+from stakeholder_store import dedupe_key, domain_of
+
+logger = get_logger(__name__)
+
+
+# Search fan-out: N generated queries x M results per provider, searched and
+# scraped concurrently. A FanoutTracker travels in the graph state and counts
+# unique URLs, contact-bearing domains and stakeholders so that stages can stop
+# issuing work early:
+#
+#   - search stops when a wave of queries adds too few new URLs (saturation),
+#   - search and scraping stop once STOP_AFTER_CONTACT_DOMAINS distinct email
+#     domains have been seen on scraped pages (each wave is scraped before the
+#     next one is searched, so this also saves search calls),
+#   - stakeholder extraction stops starting new pages once
+#     STOP_AFTER_STAKEHOLDERS unique stakeholders have been extracted.
+#
+# The defaults (1 query, 1 result per provider, no stopping rule) keep the
+# original single-query behaviour.
+#
+# Environment variables:
+#   SEARCH_QUERIES               N, queries generated per run (default: 1)
+#   SEARCH_RESULTS_PER_PROVIDER  M, results requested per query and provider (default: 1)
+#   SEARCH_CONCURRENCY           concurrent queries per wave (default: 4)
+#   SCRAPE_CONCURRENCY           concurrent page fetches (default: 4)
+#   LLM_CONCURRENCY              pages extracted concurrently (default: 8)
+#   STOP_AFTER_STAKEHOLDERS      K unique stakeholders, 0 disables (default: 0)
+#   STOP_AFTER_CONTACT_DOMAINS   K contact-bearing domains, 0 disables (default: 0)
+#   SEARCH_MIN_NEW_URL_RATIO     stop when a wave's share of new URLs falls below this (default: 0.1)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, default)))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+@dataclass
+class FanoutConfig:
+    queries: int = 1
+    results_per_provider: int = 1
+    search_concurrency: int = 4
+    scrape_concurrency: int = 4
+    llm_concurrency: int = 8
+    stop_after_stakeholders: int = 0
+    stop_after_contact_domains: int = 0
+    min_new_url_ratio: float = 0.1
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            queries=max(1, _env_int("SEARCH_QUERIES", 1)),
+            results_per_provider=max(1, _env_int("SEARCH_RESULTS_PER_PROVIDER", 1)),
+            search_concurrency=max(1, _env_int("SEARCH_CONCURRENCY", 4)),
+            scrape_concurrency=max(1, _env_int("SCRAPE_CONCURRENCY", 4)),
+            llm_concurrency=max(1, _env_int("LLM_CONCURRENCY", 8)),
+            stop_after_stakeholders=_env_int("STOP_AFTER_STAKEHOLDERS", 0),
+            stop_after_contact_domains=_env_int("STOP_AFTER_CONTACT_DOMAINS", 0),
+            min_new_url_ratio=_env_float("SEARCH_MIN_NEW_URL_RATIO", 0.1),
+        )
+
+
+class FanoutTracker:
+
+    def __init__(self, config: FanoutConfig = None):
+        self.config = config or FanoutConfig.from_env()
+        self.queries = []
+        self.urls = set()
+        self.contact_domains = set()
+        self.stakeholders = set()
+        self._saturated = False
+        self._logged_reason = None
+        self._lock = threading.Lock()
+
+    def add_queries(self, queries: list):
+        with self._lock:
+            self.queries.extend(queries)
+
+    def add_search_results(self, results: list) -> list:
+        """
+        Record a batch of search results and return only those with URLs not seen before.
+        """
+        unique = []
+        with self._lock:
+            for result in results:
+                link = result.get("link")
+                if link and link not in self.urls:
+                    self.urls.add(link)
+                    unique.append(result)
+        return unique
+
+    def check_saturation(self, returned: int, new: int):
+        """
+        Mark search as saturated when a wave returned results but few new URLs.
+        """
+        if returned > 0 and new / returned < self.config.min_new_url_ratio:
+            with self._lock:
+                self._saturated = True
+
+    def add_contacts(self, email_addresses: list):
+        with self._lock:
+            for email in email_addresses or []:
+                if "@" in email:
+                    self.contact_domains.add(domain_of(email.strip()))
+
+    def add_stakeholders(self, stakeholders: list):
+        with self._lock:
+            for stakeholder in stakeholders or []:
+                if isinstance(stakeholder, dict):
+                    key = dedupe_key(stakeholder)
+                    if key:
+                        self.stakeholders.add(key)
+
+    @property
+    def enough_stakeholders(self) -> bool:
+        k = self.config.stop_after_stakeholders
+        return bool(k) and len(self.stakeholders) >= k
+
+    @property
+    def enough_contact_domains(self) -> bool:
+        k = self.config.stop_after_contact_domains
+        return bool(k) and len(self.contact_domains) >= k
+
+    def stop_reason(self, stage: str = "search") -> str:
+        """
+        Why `stage` ("search" or "scrape") should not issue further work, or
+        None to continue. Saturation only stops searching.
+        """
+        reason = None
+        if self.enough_stakeholders:
+            reason = f"{len(self.stakeholders)} unique stakeholders found"
+        elif self.enough_contact_domains:
+            reason = f"{len(self.contact_domains)} contact-bearing domains found"
+        elif self._saturated and stage == "search":
+            reason = "search results saturated"
+
+        if reason and reason != self._logged_reason:
+            self._logged_reason = reason
+            logger.info(f"Fan-out stopping early: {reason} ({len(self.urls)} unique URLs)")
+        return reason
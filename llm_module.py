@@ -1,24 +1,12 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-from dotenv import load_dotenv
 import asyncio
 from utils import clean_ai_json_response
+from content_store import content_store
+from clients import get_llm
 
 
-import logging
+from logging_config import get_logger, summarize
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log messages will be saved to 'app.log'
-    filemode='a'  # Append to the log file instead of overwriting
-)
-logger = logging.getLogger(__name__)
-
-load_dotenv()
-
-
-llm = ChatGoogleGenerativeAI(model="gemini-2.5-flash", temperature=0.3,)
+logger = get_logger(__name__)
 
 
 def chunk(text: str, max_chars: int = 8000):
@@ -95,28 +83,45 @@ async def extract_stakeholder(llm, chunk: str, idx: int, total: int):
         {chunk}
         """
 
-    response = await asyncio.to_thread(llm.invoke, prompt)
+    response = await llm.ainvoke(prompt)
     return response.content.strip()
 
 
-async def llm_call(results: list) -> list:
+async def llm_call(results: list, deadline=None, fanout=None, concurrency: int = None) -> list:
+    """
+    Extract stakeholders from the scraped pages, up to `concurrency` at a time.
+    If `deadline` expires first, unfinished pages are abandoned and only the
+    pages extracted so far are returned. Pages not yet started are skipped
+    once `fanout` has found enough unique stakeholders.
+    """
     logger.info("Got here!")
     try:
+        started = set()
+        semaphore = asyncio.Semaphore(concurrency or max(1, len(results)))
      
-        async def process_text(result): 
-            cleaned_text = result["html_content"]["cleaned_text"]
+        async def process_text(idx, result): 
+            started.add(idx)
+            text_ref = result["html_content"]["text_ref"]
             pre_email_addresses = result["html_content"]["email_addresses"]
             pre_social_links = result["html_content"]["social_links"]
             pre_phone_numbers_1 = result["html_content"]["phone_numbers_1"]
 
-            chunked_text = chunk(cleaned_text, max_chars=8000)
-
-            chunked_response = await asyncio.gather(*[extract_stakeholder(llm, chunk, idx, len(chunk)) for idx, chunk in enumerate(chunked_text)])
-            logger.info(f"Gemini Stakeholders Extract Not cleaned: {chunked_response}")
+            # The page text is loaded only for extraction and released right after.
+            try:
+                async with semaphore:
+                    if fanout is not None and fanout.enough_stakeholders:
+                        return None
+                    chunked_text = chunk(content_store.get(text_ref), max_chars=8000)
+                    chunked_response = await asyncio.gather(*[extract_stakeholder(get_llm(), chunk, idx, len(chunk)) for idx, chunk in enumerate(chunked_text)])
+            finally:
+                content_store.release(text_ref)
+
+            logger.info("Gemini Stakeholders Extract Not cleaned: %s", summarize(chunked_response))
             clean_chunked_response = clean_ai_json_response(chunked_response)
             #gemini_data = merge_all_chunked_response(clean_chunked_response)
-            logger.info(f"Gemini Stakeholders Extract Cleaned: {clean_chunked_response}")
-
+            logger.info("Gemini Stakeholders Extract Cleaned: %s", summarize(clean_chunked_response))
+            if fanout is not None:
+                fanout.add_stakeholders(clean_chunked_response.get("stakeholders"))
 
             return {
                 "title": result["title"],
@@ -128,7 +133,32 @@ async def llm_call(results: list) -> list:
                 "stakeholder_details": clean_chunked_response
             }
 
-        return await asyncio.gather(*(process_text(result) for result in results))
+        tasks = [asyncio.create_task(process_text(idx, result)) for idx, result in enumerate(results)]
+        if deadline is None:
+            return [page for page in await asyncio.gather(*tasks) if page is not None]
+
+        try:
+            await deadline.run(asyncio.gather(*tasks, return_exceptions=True))
+        except asyncio.TimeoutError:
+            deadline.mark_partial("stakeholder extraction")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        # Pages whose task was cancelled before it started never loaded their text.
+        for idx, result in enumerate(results):
+            if idx not in started:
+                content_store.release(result["html_content"]["text_ref"])
+
+        stakeholder_details = []
+        for task in tasks:
+            if task.cancelled():
+                continue
+            if task.exception() is not None:
+                logger.error(f"Stakeholder extraction failed for a page: {str(task.exception())}")
+                continue
+            if task.result() is not None:
+                stakeholder_details.append(task.result())
+
+        return stakeholder_details
     
     except Exception as e:
         logger.info(f"There was an error in llm_call. Check: {str(e)}")
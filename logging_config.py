@@ -0,0 +1,121 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import reprlib
+
+
+# Configure logging once for the whole app. Records are handed to a queue and
+# written to a rotating `app.log` by a background listener thread, so log calls
+# on the hot path never block on disk I/O.
+#
+# Environment variables:
+#   LOG_FILE                 log file path (default: app.log)
+#   LOG_LEVEL                root level (default: INFO)
+#   LOG_MAX_BYTES            rotate after this many bytes (default: 5 MB)
+#   LOG_BACKUP_COUNT         rotated files to keep (default: 3)
+#   LOG_PAYLOAD_CHARS        max characters per summarised payload (default: 300)
+#   LOG_FULL_PAYLOADS        "1" to log payloads in full (debugging only)
+#   LOG_PAYLOAD_SAMPLE_RATE  fraction of payloads logged in full (default: 0)
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def setup_logging():
+    """
+    Install the queue handler on the root logger and start the background writer.
+    Safe to call more than once; only the first call has an effect.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.getenv("LOG_FILE", "app.log"),
+        maxBytes=_env_int("LOG_MAX_BYTES", 5 * 1024 * 1024),
+        backupCount=_env_int("LOG_BACKUP_COUNT", 3),
+        encoding="utf-8",
+    )
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+def get_logger(name: str) -> logging.Logger:
+    setup_logging()
+    return logging.getLogger(name)
+
+
+class _Payload:
+    """
+    Size-capped rendering of a payload for log messages. Pass it as a `%s`
+    argument, not inside an f-string, so it is only rendered when the record
+    is actually emitted and filtered levels skip the work.
+    """
+
+    def __init__(self, payload, limit: int, full: bool):
+        self.payload = payload
+        self.limit = limit
+        self.full = full
+
+    def __str__(self):
+        if self.full:
+            return str(self.payload)
+
+        if isinstance(self.payload, str):
+            text = self.payload
+            if len(text) <= self.limit:
+                return text
+            return f"{text[:self.limit]}... ({len(text)} chars)"
+
+        short = reprlib.Repr()
+        short.maxlevel = 3
+        short.maxlist = short.maxtuple = short.maxdict = 3
+        short.maxstring = short.maxother = min(self.limit, 80)
+        text = short.repr(self.payload)
+        if len(text) > self.limit:
+            text = text[:self.limit] + "..."
+        if isinstance(self.payload, (list, tuple, dict)):
+            text = f"{text} ({len(self.payload)} items)"
+        return text
+
+    def __format__(self, spec):
+        return format(str(self), spec)
+
+
+def summarize(payload, limit: int = None) -> _Payload:
+    """
+    Wrap a large payload (page text, scrape results, LLM output) for logging,
+    e.g. `logger.info("Scraped: %s", summarize(results))`. It is truncated unless LOG_FULL_PAYLOADS is set or it is picked by
+    LOG_PAYLOAD_SAMPLE_RATE.
+    """
+    full = os.getenv("LOG_FULL_PAYLOADS", "") == "1"
+    if not full:
+        rate = _env_float("LOG_PAYLOAD_SAMPLE_RATE", 0.0)
+        full = rate > 0 and random.random() < rate
+    return _Payload(payload, limit or _env_int("LOG_PAYLOAD_CHARS", 300), full)
@@ -1,27 +1,98 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from dotenv import load_dotenv
+
+# Load .env before any module reads its configuration from the environment.
+load_dotenv()
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-import pdfplumber
 import os
+import asyncio
+import importlib
 import re
 import json
+import time
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Optional
 from pydantic import BaseModel
-from agent_ import run_agents
+import requests
+from agent_ import run_agents, get_graph
+from deadline import Deadline
+from content_store import content_store
+from fanout import FanoutTracker
+from stakeholder_store import stakeholder_store, CONTACT_TYPES
+from clients import get_llm, get_http_session, close_clients
+from scrape_services import warm_up_browsers, shutdown_browsers
+from search_services import GOOGLE_SEARCH_URL, SERP_API_URL
 
 
-import logging
+from logging_config import get_logger, summarize
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log messages will be saved to 'app.log'
-    filemode='a'  # Append to the log file instead of overwriting
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+
+
+# Readiness for /readyz. Shared clients are created and the graph compiled in
+# the background at startup; with WARMUP=1 the browser threads, search HTTP
+# pools and the stakeholder database are opened as well. The instance should
+# only receive traffic once `ready` is set.
+startup_state = {"ready": False, "startup_seconds": None, "error": None}
+
+
+def prepare_clients():
+    get_llm()
+    get_http_session()
+    get_graph()
+
+
+def warm_up():
+    # Preload pdfplumber so the first upload does not pay for the import.
+    importlib.import_module("pdfplumber")
+
+    session = get_http_session()
+    for url in (os.getenv("GOOGLE_SEARCH_URL", GOOGLE_SEARCH_URL), os.getenv("SERP_API_URL", SERP_API_URL)):
+        try:
+            session.head(url, timeout=5)
+        except requests.RequestException as e:
+            logger.warning(f"Could not pre-open connection to {url}: {str(e)}")
+
+    if stakeholder_store.enabled:
+        stakeholder_store.open()
+
+    try:
+        warm_up_browsers()
+    except Exception as e:
+        # Dynamic scraping is only a fallback; launch lazily on first use instead.
+        logger.warning(f"Browser warm-up failed: {str(e)}")
+
+
+async def start_up():
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(prepare_clients)
+        if os.getenv("WARMUP", "0") == "1":
+            await asyncio.to_thread(warm_up)
+    except Exception as e:
+        logger.error(f"Startup failed: {str(e)}")
+        startup_state["error"] = str(e)
+        return
 
-app = FastAPI()
+    startup_state["startup_seconds"] = time.perf_counter() - started
+    startup_state["ready"] = True
+    logger.info(f"Ready after {startup_state['startup_seconds']:.2f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    startup = asyncio.create_task(start_up())
+    yield
+    startup.cancel()
+    await asyncio.to_thread(shutdown_browsers)
+    close_clients()
+    stakeholder_store.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +102,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+async def watch_disconnect(request: Request, deadline: Deadline, poll: float = 1.0):
+    """
+    Cancel `deadline` as soon as the client goes away, so the pipeline stops spending quota.
+    """
+    while not deadline.expired:
+        if await request.is_disconnected():
+            deadline.cancel("client disconnected")
+            return
+        await asyncio.sleep(poll)
+
+
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+
+@app.get("/readyz")
+async def readyz():
+    if not startup_state["ready"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "error" if startup_state["error"] else "starting", "error": startup_state["error"]},
+        )
+    return {"status": "ready", "startup_seconds": startup_state["startup_seconds"]}
+
+
 @app.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), timeout: Optional[float] = None, request: Request = None):
+    """
+    `timeout` is the time budget in seconds for this request (default
+    REQUEST_DEADLINE_SECONDS). When it runs out, or the client disconnects,
+    the stakeholders found so far are returned with `partial: true`.
+    """
+    deadline = Deadline.from_request(timeout)
     logger.info(f"Received file upload: {file.filename}")
     if not file.filename.endswith('.pdf'):
         logger.warning(f"Invalid file type: {file.filename}")
@@ -43,6 +146,8 @@ async def upload_file(file: UploadFile = File(...)):
         content = await file.read()
         f.write(content)
 
+    import pdfplumber
+
     with pdfplumber.open(temp_pdf_file) as pdf:
         text_content = ""
 
@@ -63,17 +168,37 @@ async def upload_file(file: UploadFile = File(...)):
 
 
     json_data = {
-        "metadata": metadata,
-        "cleaned_text": cleaned_text
+        "metadata": metadata
     }
 
+    preview = cleaned_text[:500]
+    # From here on the document text lives only in the content store.
+    project_ref = content_store.put(cleaned_text)
+    del text_content, content, cleaned_text
+
+    disconnect_watcher = asyncio.create_task(watch_disconnect(request, deadline)) if request is not None else None
+    stakeholder_details = None
+    fanout = FanoutTracker()
     try:
-        stakeholder_details = await run_agents(cleaned_text)
-        print("Generated Queries:", stakeholder_details)
+        stakeholder_details = await run_agents(project_ref, deadline=deadline, fanout=fanout)
+        logger.info("Generated stakeholder details: %s", summarize(stakeholder_details))
         json_data["stakeholder_details"] = stakeholder_details
         json_data["stakeholder_details_length"] = len(stakeholder_details if not stakeholder_details is None else [])
     except Exception as e:
         print(e)
+    finally:
+        content_store.release(project_ref)
+        if disconnect_watcher is not None:
+            disconnect_watcher.cancel()
+
+    if stakeholder_store.enabled and stakeholder_details:
+        try:
+            # The searched queries and the preview let later lookups find these
+            # stakeholders by the project's topic.
+            run_metadata = {**metadata, "queries": fanout.queries, "preview": preview}
+            await asyncio.to_thread(stakeholder_store.save_run, run_metadata, stakeholder_details, deadline.partial)
+        except Exception as e:
+            logger.error(f"Failed to store stakeholders for {file.filename}: {str(e)}")
 
     # json_filename = f"extracted_data/{os.path.splitext(file.filename)[0]}_{int(datetime.utcnow().timestamp())}.json"
     # with open(json_filename, "w", encoding="utf-8") as json_file:
@@ -85,13 +210,39 @@ async def upload_file(file: UploadFile = File(...)):
         "status": "success",
         "filename": file.filename,
         "metadata": metadata,
-        "preview": cleaned_text[:len(cleaned_text) if len(cleaned_text) < 500 else 500],
-        "cleaned_text": cleaned_text,
+        "preview": preview,
         "stakeholder_details": stakeholder_details,
-        "stakeholder_details_length": len(stakeholder_details if not stakeholder_details is None else [])
+        "stakeholder_details_length": len(stakeholder_details if not stakeholder_details is None else []),
+        "partial": deadline.partial,
+        "partial_reason": deadline.reason if deadline.partial else None
     }
 
 
+@app.get("/stakeholders")
+def query_stakeholders(
+    organization: Optional[str] = None,
+    domain: Optional[str] = None,
+    contact_type: Optional[str] = None,
+    q: Optional[str] = None,
+    page: int = 1,
+    page_size: int = 20,
+):
+    """
+    Look up stakeholders found by past /upload runs without re-running the pipeline.
+    """
+    if contact_type and contact_type not in CONTACT_TYPES:
+        raise HTTPException(status_code=400, detail=f"contact_type must be one of {', '.join(CONTACT_TYPES)}")
+
+    return stakeholder_store.search(
+        organization=organization,
+        domain=domain,
+        contact_type=contact_type,
+        q=q,
+        page=page,
+        page_size=page_size,
+    )
+
+
 if __name__ == "__main__":
     import uvicorn
     port = int(os.environ.get("PORT", 8000))
@@ -1,24 +1,42 @@
 import requests
-from playwright.sync_api import sync_playwright
 from bs4 import BeautifulSoup
+import os
 import re
-import pdfplumber
 import io
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeoutError
 
+from content_store import content_store
+from clients import get_http_session
 
-import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log messages will be saved to 'app.log'
-    filemode='a'  # Append to the log file instead of overwriting
-)
-logger = logging.getLogger(__name__)
+from logging_config import get_logger, summarize
+
+logger = get_logger(__name__)
+
+# Per-URL timeouts (seconds); shortened further when the request deadline has less time left.
+STATIC_TIMEOUT = 15
+DYNAMIC_TIMEOUT = 30
+DYNAMIC_SETTLE = 3
+
+# Dynamic scraping runs on dedicated browser threads. Sync Playwright objects
+# belong to the thread that created them, so each thread keeps its own Chromium
+# alive between pages and only the first page on a thread pays for the launch.
+BROWSER_WORKERS = int(os.getenv("BROWSER_WORKERS", 2))
+_browser_pool = ThreadPoolExecutor(max_workers=BROWSER_WORKERS, thread_name_prefix="browser")
+_browser_local = threading.local()
+
+# Idents of browser threads that currently hold a Playwright driver. The pool
+# does not promise one task per thread, so warm-up and shutdown hold each task's
+# thread until the others are done, which spreads their tasks over every thread.
+_browser_threads = set()
+_browser_threads_changed = threading.Condition()
+BROWSER_HANDOFF_TIMEOUT = 30
 
 
 def convert_pdf_to_text(text: str) -> str:
+    import pdfplumber
+
     pdf_bytes = io.BytesIO(text)
     all_text = ""
 
@@ -74,20 +92,20 @@ def get_html_content(html: str) -> dict:
 
 
 
-def scrape_static(url: str) -> str:
+def scrape_static(url: str, timeout: float = STATIC_TIMEOUT) -> str:
     headers = {"User-Agent": "Mozilla/5.0"}
 
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = get_http_session().get(url, headers=headers, timeout=timeout)
 
         if response.status_code == 200:
             if ".pdf" in url.lower():
                 cleaned_text = convert_pdf_to_text(response.content)
-                logger.info(f"Pdf text: {cleaned_text}")
+                logger.info("Pdf text from %s: %s", url, summarize(cleaned_text))
                 return cleaned_text
             else:
-                return response.text
                 logger.info(f"Scraped static content from {url}: {response.text[:100]}...")
+                return response.text
             
         elif response.status_code == 404:
             logger.warning(f"Page not found {url}: Status code {response.status_code}")
@@ -98,50 +116,186 @@ def scrape_static(url: str) -> str:
     return ""
 
 
-def scrape_dynamic(url: str) -> str:
+def _get_browser():
+    # Runs on a browser thread.
+    browser = getattr(_browser_local, "browser", None)
+    if browser is None or not browser.is_connected():
+        from playwright.sync_api import sync_playwright
+
+        if getattr(_browser_local, "playwright", None) is None:
+            _browser_local.playwright = sync_playwright().start()
+            with _browser_threads_changed:
+                _browser_threads.add(threading.get_ident())
+        browser = _browser_local.playwright.chromium.launch(headless=True)
+        _browser_local.browser = browser
+    return browser
+
+
+def _close_browser():
+    # Runs on a browser thread. Closes this thread's browser, then keeps the
+    # thread busy until every registered thread has closed its own, so the
+    # remaining close tasks are picked up by those threads.
+    browser = getattr(_browser_local, "browser", None)
+    playwright = getattr(_browser_local, "playwright", None)
+    _browser_local.browser = _browser_local.playwright = None
+    try:
+        if browser is not None:
+            browser.close()
+        if playwright is not None:
+            playwright.stop()
+    finally:
+        with _browser_threads_changed:
+            _browser_threads.discard(threading.get_ident())
+            _browser_threads_changed.notify_all()
+            _browser_threads_changed.wait_for(lambda: not _browser_threads, timeout=BROWSER_HANDOFF_TIMEOUT)
+
+
+def _warm_up_browser(barrier: threading.Barrier):
+    # Runs on a browser thread. The barrier keeps this thread busy until every
+    # warm-up task has started, so each one runs on a different thread.
+    try:
+        _get_browser()
+    finally:
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+
+
+def _render(url: str, deadline=None) -> str:
+    # Runs on a browser thread. Renders can wait in the queue behind others, so
+    # the timeout is taken from the deadline when the render starts, and a
+    # render whose deadline has already passed is skipped.
+    if deadline is not None and deadline.expired:
+        return ""
+    timeout = deadline.timeout(DYNAMIC_TIMEOUT) if deadline is not None else DYNAMIC_TIMEOUT
+
+    page = _get_browser().new_page()
+    try:
+        if ".pdf" in url.lower():
+            pdf_bytes = page.request.get(url, timeout=timeout * 1000).body()
+            return convert_pdf_to_text(pdf_bytes)
+
+        page.goto(url, timeout=timeout * 1000)
+        page.wait_for_timeout(min(DYNAMIC_SETTLE, timeout) * 1000)
+        return page.content()
+    finally:
+        page.close()
+
+
+def warm_up_browsers():
+    """
+    Launch Chromium on every browser thread ahead of the first dynamic scrape.
+    """
+    barrier = threading.Barrier(BROWSER_WORKERS, timeout=BROWSER_HANDOFF_TIMEOUT)
+    futures = [_browser_pool.submit(_warm_up_browser, barrier) for _ in range(BROWSER_WORKERS)]
+    for future in futures:
+        future.result()
+
+
+def shutdown_browsers():
+    """
+    Close every browser and Playwright driver started by the browser threads.
+    """
+    # One task per pool thread: threads without a browser just wait until the
+    # registered ones are closed.
+    futures = [_browser_pool.submit(_close_browser) for _ in range(BROWSER_WORKERS)]
+    for future in futures:
+        try:
+            future.result()
+        except Exception as e:
+            logger.warning(f"Error closing browser: {str(e)}")
+
+    with _browser_threads_changed:
+        if _browser_threads:
+            logger.warning(f"{len(_browser_threads)} browser threads did not close their browser")
+
+
+def scrape_dynamic(url: str, deadline=None) -> str:
     html = ""
+    wait_s = (deadline.remaining() if deadline is not None else DYNAMIC_TIMEOUT) + DYNAMIC_SETTLE
+    future = _browser_pool.submit(_render, url, deadline)
     try:
-        with sync_playwright() as p:
-            browswer = p.chromium.launch(headless=True)
-            page = browswer.new_page()
-            if ".pdf" in url.lower():
-                pdf_bytes = page.request.get(url).body()
-                html = convert_pdf_to_text(pdf_bytes)
-            else:
-                page.goto(url, timeout=30000)
-                page.wait_for_timeout(3000)
-                html = page.content()
-
-            browswer.close()
+        html = future.result(timeout=wait_s)
+    except FutureTimeoutError:
+        # Drop the render if it is still queued; a running one is bounded by its own timeout.
+        future.cancel()
+        logger.error(f"Timed out scraping {url} dynamically after {wait_s:.1f}s")
     except Exception as e:
         logger.error(f"Error scraping {url} dynamically: {str(e)}")
 
+    if not html and deadline is not None and deadline.expired:
+        deadline.mark_partial("scrape")
+
     logger.info(f"Scraped dynamic content from {url}: {html[:100]}...")
      
     return html
 
 
-def scrape_urls(results: list) -> list:
-    scrape_results = []
-    for item in results:
-        url = item["link"]
-        html = scrape_static(url)
-        html_content = get_html_content(html)
+def scrape_page(item: dict, deadline=None) -> dict:
+    url = item["link"]
+    timeout = deadline.timeout(STATIC_TIMEOUT) if deadline is not None else STATIC_TIMEOUT
+    html = scrape_static(url, timeout)
+    html_content = get_html_content(html)
 
-        if not html or len(html) < 500:
-            html = scrape_dynamic(url)
+    if not html or len(html) < 500:
+        if deadline is not None and deadline.expired:
+            deadline.mark_partial("scrape")
+        else:
+            html = scrape_dynamic(url, deadline)
             html_content = get_html_content(html)
 
+    # Keep only a handle to the page text in the pipeline state.
+    cleaned_text = html_content.pop("cleaned_text")
+    html_content["text_ref"] = content_store.put(cleaned_text)
+    html_content["text_length"] = len(cleaned_text)
 
+    return {
+        "title": item.get("title"),
+        "link": url,
+        "snippet": item.get("snippet"),
+        "html_content": html_content,
+    }
 
-        scrape_results.append({
-            "title": item.get("title"),
-            "link": url,
-            "snippet": item.get("snippet"),
-            "html_content": html_content,
-        })
 
-    logger.info(f"Scraped result check: {scrape_results}")
+def scrape_urls(results: list, deadline=None, fanout=None, concurrency: int = 1) -> list:
+    """
+    Scrape `results` with up to `concurrency` pages in flight. New pages stop
+    being started once `deadline` expires or `fanout` has seen enough
+    contact-bearing domains; results keep the input order.
+    """
+    workers = max(1, concurrency)
+    scraped = {}
+    items = iter(enumerate(results))
+
+    def should_stop() -> bool:
+        if deadline is not None and deadline.expired:
+            deadline.mark_partial("scrape")
+            return True
+        return fanout is not None and fanout.stop_reason("scrape") is not None
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        while True:
+            while len(pending) < workers and not should_stop():
+                idx, item = next(items, (None, None))
+                if item is None:
+                    break
+                pending[pool.submit(scrape_page, item, deadline)] = idx
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                idx = pending.pop(future)
+                scraped[idx] = future.result()
+                if fanout is not None:
+                    fanout.add_contacts(scraped[idx]["html_content"]["email_addresses"])
+
+    scrape_results = [scraped[idx] for idx in sorted(scraped)]
+
+    logger.info("Scraped result check: %s", summarize(scrape_results))
 
     return scrape_results
 
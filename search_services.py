@@ -3,67 +3,93 @@ import json
 import re
 import requests
 
-from dotenv import load_dotenv
+from clients import get_http_session
 
-import logging
+from logging_config import get_logger, summarize
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    filename='app.log',  # Log messages will be saved to 'app.log'
-    filemode='a'  # Append to the log file instead of overwriting
-)
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
-load_dotenv()
 
-def search_google(query: str, num_results: int = 5):
+# Both endpoints can be overridden from the environment, e.g. to point the
+# pipeline at the local stand-ins in benchmarks/.
+GOOGLE_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+SERP_API_URL = "https://serpapi.com/search"
+
+# Per-call timeout (seconds) for search requests; shortened further when the
+# request deadline has less time left.
+SEARCH_TIMEOUT = 15
+
+# Google CSE returns at most 10 results per request and nothing past the 100th.
+CSE_PAGE_SIZE = 10
+CSE_MAX_RESULTS = 100
+
+
+def _timeout(deadline) -> float:
+    return deadline.timeout(SEARCH_TIMEOUT) if deadline is not None else SEARCH_TIMEOUT
+
+
+def search_google(query: str, num_results: int = 5, deadline=None):
     """
     Search using Google Custom Search API.
+    More than CSE_PAGE_SIZE results are fetched page by page using `start`;
+    with a `deadline`, each page's timeout comes from the remaining budget and
+    no further pages are requested once it has expired.
     """
     api_key = os.getenv("GOOGLE_SEARCH_API_KEY")
     cx = os.getenv("GOOGLE_CX")
-    url = "https://www.googleapis.com/customsearch/v1"
-
-    params = {
-        "q": query,
-        "key": api_key,   # correct parameter name for API key
-        "cx": cx,
-        "num": num_results
-    }
-
-    logger.info(f"Google Search params: {params}")
-
-    try:
-        response = requests.get(url, params=params)
-    except requests.RequestException as e:
-        logger.error(f"Error during Google Search API request: {str(e)}")
-        return []
-
-    if response.status_code == 200:
-        data = response.json()
-        results = []
-        for item in data.get("items", []):
+    url = os.getenv("GOOGLE_SEARCH_URL", GOOGLE_SEARCH_URL)
+
+    num_results = min(num_results, CSE_MAX_RESULTS)
+    results = []
+
+    while len(results) < num_results:
+        if deadline is not None and deadline.expired:
+            deadline.mark_partial("search")
+            break
+
+        params = {
+            "q": query,
+            "key": api_key,   # correct parameter name for API key
+            "cx": cx,
+            "num": min(CSE_PAGE_SIZE, num_results - len(results))
+        }
+        if results:
+            params["start"] = len(results) + 1
+
+        logger.info(f"Google Search params: {params}")
+
+        try:
+            response = get_http_session().get(url, params=params, timeout=_timeout(deadline))
+        except requests.RequestException as e:
+            logger.error(f"Error during Google Search API request: {str(e)}")
+            break
+
+        if response.status_code != 200:
+            logger.error("Google API error: %s - %s", response.status_code, summarize(response.text))
+            break
+
+        items = response.json().get("items", [])
+        for item in items:
             results.append({
                 "title": item.get("title"),
                 "link": item.get("link"),
                 "snippet": item.get("snippet")
             })
 
-        logger.info(f"Google returned {len(results)} results for '{query}'")
-        return results
-    else:
-        logger.error(f"Google API error: {response.status_code} - {response.text}")
-        return []
+        # A short page means there are no more results for this query.
+        if len(items) < params["num"]:
+            break
+
+    logger.info(f"Google returned {len(results)} results for '{query}'")
+    return results
 
 
-def search_serp(query: str, num_results: int = 5):
+def search_serp(query: str, num_results: int = 5, deadline=None):
     """
     Search using SerpAPI.
     """
     api_key = os.getenv("SERP_API_KEY")
-    url = "https://serpapi.com/search"
+    url = os.getenv("SERP_API_URL", SERP_API_URL)
 
     params = {
         "q": query,
@@ -74,7 +100,7 @@ def search_serp(query: str, num_results: int = 5):
     logger.info(f"SerpAPI params: {params}")
 
     try:
-        response = requests.get(url, params=params)
+        response = get_http_session().get(url, params=params, timeout=_timeout(deadline))
     except requests.RequestException as e:
         logger.error(f"Error during SerpAPI request: {str(e)}")
         return []
@@ -94,23 +120,24 @@ def search_serp(query: str, num_results: int = 5):
         logger.info(f"SerpAPI returned {len(results)} results for '{query}'")
         return results
     else:
-        logger.error(f"SerpAPI API error: {response.status_code} - {response.text}")
+        logger.error("SerpAPI API error: %s - %s", response.status_code, summarize(response.text))
         return []
 
 
-def search_all(query: str, num_results: int = 5):
+def search_all(query: str, num_results: int = 5, deadline=None):
     """
     Aggregate results from all APIs.
+    Providers not yet queried are skipped once `deadline` has expired.
     """
     all_results = []
 
     logger.info(f"Starting combined search for '{query}'")
 
-    res1 = search_google(query, num_results)
-    all_results.extend(res1)
-
-    res2 = search_serp(query, num_results)
-    all_results.extend(res2)
+    for search in (search_google, search_serp):
+        if deadline is not None and deadline.expired:
+            deadline.mark_partial("search")
+            break
+        all_results.extend(search(query, num_results, deadline))
 
     logger.info(f"Total combined results: {len(all_results)}")
 
@@ -0,0 +1,440 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+from logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+# Every /upload run is persisted to a local SQLite database so past results can
+# be queried without re-running the pipeline. Stakeholders are deduplicated by
+# normalised email, or by normalised name + organisation when there is no email,
+# and linked to the pages (sources) and documents they were found in. Keyword
+# and organisation lookups go through FTS5 indexes: one over the stakeholders'
+# own fields, one over page titles and snippets, and one over each document's
+# filename, search queries and text preview. A keyword matches a stakeholder
+# directly or through any page or document it is linked to, so the context of
+# a recurring stakeholder is never concatenated into a single growing row.
+#
+# Environment variables:
+#   STAKEHOLDER_DB_PATH   database file (default: extracted_data/stakeholders.db)
+#   STAKEHOLDER_STORE     "0" to disable persistence (default: enabled)
+
+CONTACT_TYPES = ("email", "phone", "social")
+MAX_PAGE_SIZE = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    filename TEXT,
+    uploadtime TEXT,
+    wordcount INTEGER,
+    partial INTEGER NOT NULL DEFAULT 0,
+    queries TEXT,
+    preview TEXT
+);
+
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    link TEXT NOT NULL UNIQUE,
+    domain TEXT,
+    title TEXT,
+    snippet TEXT
+);
+
+CREATE TABLE IF NOT EXISTS stakeholders (
+    id INTEGER PRIMARY KEY,
+    dedupe_key TEXT NOT NULL UNIQUE,
+    name TEXT,
+    organization TEXT,
+    email TEXT,
+    phone TEXT,
+    domain TEXT,
+    social_links TEXT,
+    other_info TEXT,
+    has_email INTEGER NOT NULL DEFAULT 0,
+    has_phone INTEGER NOT NULL DEFAULT 0,
+    has_social INTEGER NOT NULL DEFAULT 0,
+    first_seen TEXT,
+    last_seen TEXT
+);
+
+CREATE TABLE IF NOT EXISTS stakeholder_sources (
+    stakeholder_id INTEGER NOT NULL REFERENCES stakeholders(id),
+    source_id INTEGER NOT NULL REFERENCES sources(id),
+    document_id INTEGER NOT NULL REFERENCES documents(id),
+    PRIMARY KEY (stakeholder_id, source_id, document_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stakeholders_domain ON stakeholders(domain);
+CREATE INDEX IF NOT EXISTS idx_stakeholders_last_seen ON stakeholders(last_seen);
+CREATE INDEX IF NOT EXISTS idx_stakeholders_has_email ON stakeholders(has_email, last_seen);
+CREATE INDEX IF NOT EXISTS idx_stakeholders_has_phone ON stakeholders(has_phone, last_seen);
+CREATE INDEX IF NOT EXISTS idx_stakeholders_has_social ON stakeholders(has_social, last_seen);
+CREATE INDEX IF NOT EXISTS idx_stakeholder_sources_source ON stakeholder_sources(source_id);
+CREATE INDEX IF NOT EXISTS idx_stakeholder_sources_document ON stakeholder_sources(document_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS stakeholders_fts USING fts5(
+    name, organization, email, other_info
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS sources_fts USING fts5(
+    title, snippet, domain
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    filename, queries, preview
+);
+"""
+
+
+def _text(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_text(v) for v in value if v)
+    return str(value).strip()
+
+
+def normalize(value) -> str:
+    """
+    Lower-case, drop punctuation and collapse whitespace for deduplication.
+    """
+    value = re.sub(r"[^\w@.+-]+", " ", _text(value).lower())
+    return re.sub(r"\s+", " ", value).strip()
+
+
+def domain_of(email: str = "", link: str = "") -> str:
+    if email and "@" in email:
+        return email.rsplit("@", 1)[1].lower()
+    if link:
+        host = urlparse(link).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+    return ""
+
+
+def dedupe_key(stakeholder: dict) -> str:
+    email = normalize(stakeholder.get("email"))
+    if "@" in email:
+        return f"email:{email}"
+
+    name = normalize(stakeholder.get("name"))
+    organization = normalize(stakeholder.get("organization"))
+    if not name and not organization:
+        return ""
+    return f"name:{name}|org:{organization}"
+
+
+def _fts_query(text: str, column: str = None) -> str:
+    # Quote every term so user input cannot inject FTS5 syntax.
+    terms = [t.replace('"', '""') for t in re.findall(r"\w+", text or "")]
+    if not terms:
+        return ""
+    phrase = " ".join(f'"{t}"' for t in terms)
+    return f"{column} : ({phrase})" if column else phrase
+
+
+class StakeholderStore:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(os.getenv("STAKEHOLDER_DB_PATH", os.path.join("extracted_data", "stakeholders.db")))
+
+    @property
+    def enabled(self) -> bool:
+        return os.getenv("STAKEHOLDER_STORE", "1") != "0"
+
+    def _connect(self) -> sqlite3.Connection:
+        # Called with the lock held.
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._migrate(conn)
+            self._conn = conn
+        return self._conn
+
+    def _migrate(self, conn):
+        with conn:
+            # Databases created before documents carried queries and preview.
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(documents)")}
+            for column in ("queries", "preview"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE documents ADD COLUMN {column} TEXT")
+
+            # Databases whose stakeholder index still carried the page and
+            # document context in a `context` column: rebuild all three indexes.
+            fts_columns = {row["name"] for row in conn.execute("PRAGMA table_info(stakeholders_fts)")}
+            if "context" in fts_columns:
+                logger.info("Rebuilding stakeholder search indexes")
+                conn.execute("DROP TABLE stakeholders_fts")
+                conn.execute("CREATE VIRTUAL TABLE stakeholders_fts USING fts5(name, organization, email, other_info)")
+                conn.execute("DELETE FROM sources_fts")
+                conn.execute("DELETE FROM documents_fts")
+                conn.execute(
+                    "INSERT INTO stakeholders_fts (rowid, name, organization, email, other_info) "
+                    "SELECT id, name, organization, email, other_info FROM stakeholders"
+                )
+                conn.execute("INSERT INTO sources_fts (rowid, title, snippet, domain) SELECT id, title, snippet, domain FROM sources")
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, filename, queries, preview) "
+                    "SELECT id, filename, queries, preview FROM documents"
+                )
+
+    def open(self):
+        """
+        Open the database and create the schema ahead of the first request.
+        """
+        with self._lock:
+            self._connect()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def save_run(self, metadata: dict, stakeholder_details: list, partial: bool = False) -> int:
+        """
+        Persist one /upload result (the `stakeholder_details` pages returned by
+        run_agents). `metadata` may carry the run's search `queries` and the
+        document `preview`, which make the run searchable by project topic.
+        Returns the document id.
+        """
+        now = datetime.utcnow().isoformat()
+
+        queries = json.dumps(metadata.get("queries") or [])
+        preview = _text(metadata.get("preview"))
+
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                document_id = conn.execute(
+                    """
+                    INSERT INTO documents (filename, uploadtime, wordcount, partial, queries, preview)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (metadata.get("filename"), metadata.get("uploadtime"), metadata.get("wordcount"), int(bool(partial)),
+                     queries, preview),
+                ).lastrowid
+                conn.execute(
+                    "INSERT INTO documents_fts (rowid, filename, queries, preview) VALUES (?, ?, ?, ?)",
+                    (document_id, _text(metadata.get("filename")), queries, preview),
+                )
+
+                saved = 0
+                touched = set()
+                for page in stakeholder_details or []:
+                    source_id = self._upsert_source(conn, page)
+                    stakeholders = (page.get("stakeholder_details") or {}).get("stakeholders") or []
+                    for stakeholder in stakeholders:
+                        if not isinstance(stakeholder, dict):
+                            continue
+                        stakeholder_id = self._upsert_stakeholder(conn, stakeholder, page, now)
+                        if stakeholder_id is None:
+                            continue
+                        conn.execute(
+                            "INSERT OR IGNORE INTO stakeholder_sources (stakeholder_id, source_id, document_id) VALUES (?, ?, ?)",
+                            (stakeholder_id, source_id, document_id),
+                        )
+                        touched.add(stakeholder_id)
+                        saved += 1
+
+                # Each stakeholder is re-indexed once per run, from its own fields only.
+                for stakeholder_id in touched:
+                    self._index(conn, stakeholder_id)
+
+        logger.info(f"Stored {saved} stakeholders from {metadata.get('filename')} (document {document_id})")
+        return document_id
+
+    def _upsert_source(self, conn, page: dict) -> int:
+        link = _text(page.get("link"))
+        conn.execute(
+            """
+            INSERT INTO sources (link, domain, title, snippet) VALUES (?, ?, ?, ?)
+            ON CONFLICT(link) DO UPDATE SET title = excluded.title, snippet = excluded.snippet
+            """,
+            (link, domain_of(link=link), _text(page.get("title")), _text(page.get("snippet"))),
+        )
+        row = conn.execute("SELECT id, title, snippet, domain FROM sources WHERE link = ?", (link,)).fetchone()
+        conn.execute("DELETE FROM sources_fts WHERE rowid = ?", (row["id"],))
+        conn.execute(
+            "INSERT INTO sources_fts (rowid, title, snippet, domain) VALUES (?, ?, ?, ?)",
+            (row["id"], row["title"], row["snippet"], row["domain"]),
+        )
+        return row["id"]
+
+    def _upsert_stakeholder(self, conn, stakeholder: dict, page: dict, now: str):
+        key = dedupe_key(stakeholder)
+        if not key:
+            return None
+
+        email = _text(stakeholder.get("email")).lower()
+        phone = _text(stakeholder.get("phone"))
+        social = stakeholder.get("social_links")
+        social = {k: v for k, v in social.items() if v} if isinstance(social, dict) else {}
+
+        row = conn.execute("SELECT id, social_links FROM stakeholders WHERE dedupe_key = ?", (key,)).fetchone()
+        if row is not None:
+            social = {**json.loads(row["social_links"] or "{}"), **social}
+
+        # Existing non-empty fields win; new values only fill the gaps.
+        conn.execute(
+            """
+            INSERT INTO stakeholders (
+                dedupe_key, name, organization, email, phone, domain, social_links, other_info,
+                has_email, has_phone, has_social, first_seen, last_seen
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(dedupe_key) DO UPDATE SET
+                name = COALESCE(NULLIF(stakeholders.name, ''), excluded.name),
+                organization = COALESCE(NULLIF(stakeholders.organization, ''), excluded.organization),
+                email = COALESCE(NULLIF(stakeholders.email, ''), excluded.email),
+                phone = COALESCE(NULLIF(stakeholders.phone, ''), excluded.phone),
+                domain = COALESCE(NULLIF(stakeholders.domain, ''), excluded.domain),
+                social_links = excluded.social_links,
+                other_info = COALESCE(NULLIF(stakeholders.other_info, ''), excluded.other_info),
+                has_email = MAX(stakeholders.has_email, excluded.has_email),
+                has_phone = MAX(stakeholders.has_phone, excluded.has_phone),
+                has_social = MAX(stakeholders.has_social, excluded.has_social),
+                last_seen = excluded.last_seen
+            """,
+            (
+                key,
+                _text(stakeholder.get("name")),
+                _text(stakeholder.get("organization")),
+                email,
+                phone,
+                domain_of(email, _text(page.get("link"))),
+                json.dumps(social),
+                _text(stakeholder.get("other_info")),
+                int("@" in email),
+                int(bool(phone)),
+                int(bool(social)),
+                now,
+                now,
+            ),
+        )
+        return row["id"] if row is not None else conn.execute(
+            "SELECT id FROM stakeholders WHERE dedupe_key = ?", (key,)
+        ).fetchone()["id"]
+
+    def _index(self, conn, stakeholder_id: int):
+        # Rebuild the FTS row from the merged stakeholder; page and document
+        # context is matched through their own indexes in `search`.
+        row = conn.execute(
+            "SELECT name, organization, email, other_info FROM stakeholders WHERE id = ?", (stakeholder_id,)
+        ).fetchone()
+        conn.execute("DELETE FROM stakeholders_fts WHERE rowid = ?", (stakeholder_id,))
+        conn.execute(
+            "INSERT INTO stakeholders_fts (rowid, name, organization, email, other_info) VALUES (?, ?, ?, ?, ?)",
+            (stakeholder_id, row["name"], row["organization"], row["email"], row["other_info"]),
+        )
+
+    def search(self, organization: str = None, domain: str = None, contact_type: str = None,
+               q: str = None, page: int = 1, page_size: int = 20) -> dict:
+        """
+        Query stored stakeholders. `organization` and `q` are full-text matches,
+        `domain` is an exact (email or site) domain, `contact_type` is one of
+        CONTACT_TYPES. Results are ordered by most recently seen.
+        """
+        if contact_type and contact_type not in CONTACT_TYPES:
+            raise ValueError(f"contact_type must be one of {', '.join(CONTACT_TYPES)}")
+
+        page = max(1, page)
+        page_size = min(max(1, page_size), MAX_PAGE_SIZE)
+
+        where, params = [], []
+        organization_match = _fts_query(organization, "organization")
+        if organization_match:
+            where.append("st.id IN (SELECT rowid FROM stakeholders_fts WHERE stakeholders_fts MATCH ?)")
+            params.append(organization_match)
+        keyword_match = _fts_query(q)
+        if keyword_match:
+            # The keyword may match the stakeholder itself, a page it was found
+            # on, or a document (project) it was found for.
+            where.append(
+                """
+                st.id IN (
+                    SELECT rowid FROM stakeholders_fts WHERE stakeholders_fts MATCH ?
+                    UNION
+                    SELECT stakeholder_id FROM stakeholder_sources
+                    WHERE source_id IN (SELECT rowid FROM sources_fts WHERE sources_fts MATCH ?)
+                    UNION
+                    SELECT stakeholder_id FROM stakeholder_sources
+                    WHERE document_id IN (SELECT rowid FROM documents_fts WHERE documents_fts MATCH ?)
+                )
+                """
+            )
+            params.extend([keyword_match] * 3)
+        if domain:
+            where.append("st.domain = ?")
+            params.append(domain.lower().strip())
+        if contact_type:
+            where.append(f"st.has_{contact_type} = 1")
+
+        where_sql = f"WHERE {' AND '.join(where)}" if where else ""
+
+        with self._lock:
+            conn = self._connect()
+            total = conn.execute(f"SELECT COUNT(*) FROM stakeholders st {where_sql}", params).fetchone()[0]
+            rows = conn.execute(
+                f"""
+                SELECT st.* FROM stakeholders st {where_sql}
+                ORDER BY st.last_seen DESC, st.id DESC
+                LIMIT ? OFFSET ?
+                """,
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+
+            sources = {}
+            ids = [row["id"] for row in rows]
+            if ids:
+                placeholders = ", ".join("?" for _ in ids)
+                for source in conn.execute(
+                    f"""
+                    SELECT DISTINCT ss.stakeholder_id, s.link, s.title
+                    FROM stakeholder_sources ss JOIN sources s ON s.id = ss.source_id
+                    WHERE ss.stakeholder_id IN ({placeholders})
+                    """,
+                    ids,
+                ):
+                    sources.setdefault(source["stakeholder_id"], []).append(
+                        {"link": source["link"], "title": source["title"]}
+                    )
+
+        results = [
+            {
+                "id": row["id"],
+                "name": row["name"],
+                "organization": row["organization"],
+                "email": row["email"],
+                "phone": row["phone"],
+                "domain": row["domain"],
+                "social_links": json.loads(row["social_links"] or "{}"),
+                "other_info": row["other_info"],
+                "first_seen": row["first_seen"],
+                "last_seen": row["last_seen"],
+                "sources": sources.get(row["id"], []),
+            }
+            for row in rows
+        ]
+
+        return {"total": total, "page": page, "page_size": page_size, "results": results}
+
+
+stakeholder_store = StakeholderStore.from_env()